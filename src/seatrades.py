@@ -1,10 +1,53 @@
-from typing import Dict, Literal, List, Optional
+from typing import Any, Dict, Literal, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain
 from time import time
+import csv
 import logging
+import os
 
+import numpy as np
 import pulp
 import pandas as pd
 import altair as alt
+from scipy import optimize, sparse
+
+# scipy.optimize.milp status -> PuLP status code.
+_MILP_STATUS = {
+    0: pulp.LpStatusOptimal,
+    2: pulp.LpStatusInfeasible,
+    3: pulp.LpStatusUnbounded,
+}
+
+
+@lru_cache(maxsize=None)
+def _highs_available() -> bool:
+    """Probes once for the HiGHS binary; the result is fixed per process."""
+    return pulp.HiGHS_CMD().available()
+
+
+def _default_solver(warm_start: bool = False) -> pulp.LpSolver:
+    """
+    Returns the solver used for seatrade assignment.
+    Prefers HiGHS, which is considerably faster than CBC on
+    assignment-style MIPs, and falls back to PuLP's bundled CBC.
+    Without a warm start, HiGHS is run in-process through highspy when
+    installed, skipping the model file round-trip of the command line
+    solvers; PuLP's highspy interface cannot take a starting solution.
+
+    Parameters
+    ----------
+    warm_start : bool
+        Whether the solver should start from the variables' initial values.
+    """
+    threads = os.cpu_count()
+    if not warm_start:
+        solver = pulp.HiGHS(threads=threads)
+        if solver.available():
+            return solver
+    if _highs_available():
+        return pulp.HiGHS_CMD(threads=threads, warmStart=warm_start)
+    return pulp.PULP_CBC_CMD(threads=threads, warmStart=warm_start)
 
 
 class Seatrades:
@@ -26,37 +69,81 @@ class Seatrades:
         seatrades_prefs : dict
             A json-like dict containing the seatrade-minsize-maxsize
             information.
+
+        Camper preferences are fixed here: both `assign` backends read them
+        from the rank lookups built below, so later edits to `camper_prefs`
+        are ignored. Seatrade sizes are re-read from `seatrades_prefs` on
+        every solve.
         """
         # Helper Function
-        def flatten(outer_list: List[list]):
-            """Flattens the 2d input list into 1d."""
-            return {
-                key: value
-                for inner_dict in outer_list.values()
-                for key, value in inner_dict.items()
-            }
-
-        # def flatten_dict(outer_dict: Dict[dict]):
-        #     """Flattens the 2d input dict into 1d."""
-        #     output_dict = {}
-        #     for inner_dict in outer_dict.values():
-        #         for key, value in inner_dict.items():
-        #             output_dict[key] = value
-        #     return output_dict
+        def flatten(outer_dict: Dict[Any, dict]) -> dict:
+            """Flattens the 2d input dict of dicts into 1d."""
+            return dict(
+                chain.from_iterable(
+                    inner_dict.items() for inner_dict in outer_dict.values()
+                )
+            )
 
         self.cabin_camper_prefs = cabin_camper_prefs
         self.cabins = list(cabin_camper_prefs.keys())
         self.camper_prefs = flatten(self.cabin_camper_prefs)
         self.campers = list(self.camper_prefs.keys())
+        # 0-indexed rank of each preferred seatrade, for O(1) penalty lookups.
+        self.camper_pref_ranks = {
+            camper: {seatrade: rank for rank, seatrade in enumerate(preferences)}
+            for camper, preferences in self.camper_prefs.items()
+        }
         # Seatrades for block 1 and block 2.
         self.seatrades_prefs = seatrades_prefs
         self.seatrades = list(seatrades_prefs.keys())
         self.seatrades1 = [f"1_{seatrade}" for seatrade in self.seatrades]
         self.seatrades2 = [f"2_{seatrade}" for seatrade in self.seatrades]
         self.seatrades_full = self.seatrades1 + self.seatrades2
+        # Lookups to avoid re-parsing the block prefix off seatrade labels.
+        self.seatrade_of = dict(
+            zip(self.seatrades_full, self.seatrades + self.seatrades)
+        )
+        self.seatrade_index = {s: j for j, s in enumerate(self.seatrades_full)}
+        # Dense camper x seatrades_full matrix of 1-indexed preference
+        # ranks, 0 where the camper did not request the seatrade.
+        # Built with one scatter over integer codes rather than nested loops.
+        pref_counts = np.array(
+            [len(p) for p in self.camper_prefs.values()], dtype=np.intp
+        )
+        flat_prefs = [s for p in self.camper_prefs.values() for s in p]
+        pref_rows = np.repeat(np.arange(len(self.campers)), pref_counts)
+        pref_cols = pd.Index(self.seatrades).get_indexer(flat_prefs)
+        if (pref_cols < 0).any():
+            unknown = sorted({s for s in flat_prefs if s not in seatrades_prefs})
+            raise ValueError(f"Campers requested unknown seatrades: {unknown}")
+        # 1-indexed position of each preference within its camper's list.
+        pref_ranks = np.arange(1, len(flat_prefs) + 1) - np.repeat(
+            np.cumsum(pref_counts) - pref_counts, pref_counts
+        )
+        self.camper_pref_matrix = np.zeros(
+            (len(self.campers), len(self.seatrades_full)), dtype=np.int16
+        )
+        self.camper_pref_matrix[pref_rows, pref_cols] = pref_ranks
+        self.camper_pref_matrix[pref_rows, pref_cols + len(self.seatrades)] = pref_ranks
         self.assignments: pd.DataFrame
+        # Variable values from the last optimal solve, used to warm start.
+        self._last_solution: Dict[str, float] = {}
+        # Preference-derived parts of the scipy model by symmetry_breaking
+        # flag, built on first use.
+        self._scipy_models: Dict[bool, tuple] = {}
+        # Number of assign() calls, identifying the current assignments.
+        self._solve_count = 0
+        # Chart with the solve it was drawn from, reused until the next solve.
+        self._chart_cache: Optional[Tuple[int, alt.LayerChart]] = None
 
-    def assign(self) -> int:
+    def assign(
+        self,
+        solver: Optional[pulp.LpSolver] = None,
+        warm_start: bool = True,
+        method: Literal["pulp", "scipy"] = "pulp",
+        symmetry_breaking: bool = True,
+        constraint_names: bool = False,
+    ) -> int:
         """
         Uses the objects campers_df and seatrades_df to solve a Linear Programming
         problem to assign each camper to their ideal seatrades while respecting
@@ -64,105 +151,440 @@ class Seatrades:
 
         Details found in documentation/seatrades_assignment_math.md.
 
+        Parameters
+        ----------
+        solver : pulp.LpSolver, optional
+            The solver to use. Defaults to multi-threaded HiGHS run in-process
+            through highspy when `warm_start` is False, otherwise (or if
+            highspy is missing) the HiGHS command line solver if installed,
+            otherwise PuLP's bundled CBC.
+        warm_start : bool
+            Whether to seed the solver with a starting solution: the
+            solution of the previous successful call if there is one,
+            otherwise a greedy assignment. Injected solvers must have been
+            created with warmStart=True to make use of it. The default
+            solver is then a command line solver, as PuLP's in-process
+            HiGHS cannot take a starting solution.
+        method : {"pulp", "scipy"}
+            "pulp" builds the model with PuLP and solves it with `solver`.
+            "scipy" builds the constraint matrix directly as a sparse matrix
+            and solves it with HiGHS through scipy.optimize.milp, skipping
+            PuLP's expression objects and file round-trip. `solver` and
+            `warm_start` are ignored in this mode.
+        symmetry_breaking : bool
+            Whether to add a constraint that rules out mirrored solutions.
+            Swapping every camper's block 1 and block 2 seatrades gives an
+            equally good assignment, so the first camper (by name) is made
+            to take their better-ranked seatrade in block 1. This halves the
+            search space without changing the optimal objective.
+        constraint_names : bool
+            Whether to give the PuLP constraints descriptive names, which
+            helps when reading the model with problem.writeLP while
+            debugging. Off by default, PuLP then numbers the constraints
+            itself and no name strings are formatted.
+
         Returns
         -------
         int
             A status code representing feasibility of the problem.
             1 if failure, 0 if success.
         """
+        self._solve_count += 1
+        if method == "scipy":
+            self.status = self._assign_scipy(symmetry_breaking)
+            return self.status
+
         # Setup problem and parameters.
         problem = pulp.LpProblem(name="seatrades_assignment")
-        assignments = pulp.LpVariable.dicts(
-            "Assignment",
-            (self.campers, self.seatrades_full),
-            lowBound=0,
-            upBound=1,
-            cat=pulp.LpInteger,
-        )
+        # Campers can only ever take seatrades they requested, so variables
+        # are only created for those (camper, block_seatrade) pairs. Like the
+        # penalties below, they follow the preferences fixed in __init__.
+        # Variables get short index-based names (camper i, seatrade column j),
+        # keeping the solver's model file small and names collision-free.
+        assignments = {
+            c: {
+                block_s: pulp.LpVariable(
+                    f"x_{i}_{self.seatrade_index[block_s]}",
+                    lowBound=0,
+                    upBound=1,
+                    cat=pulp.LpInteger,
+                )
+                for block in [1, 2]
+                for block_s in (f"{block}_{s}" for s in pref_ranks)
+            }
+            for i, (c, pref_ranks) in enumerate(self.camper_pref_ranks.items())
+        }
 
         # CONSTRAINTS:
+        # Rows are built straight from (variable, coefficient) pairs with
+        # LpAffineExpression, skipping lpSum's term-by-term accumulation.
         # Constraint 1: Each camper is assigned 1 seatrade in each of 2 blocks.
-        for block_index, seatrades in enumerate([self.seatrades1, self.seatrades2]):
-            for c in self.campers:
+        for block in [1, 2]:
+            for c, pref_ranks in self.camper_pref_ranks.items():
                 problem += (
-                    pulp.lpSum([assignments[c][s] for s in seatrades]) == 1,
-                    f"{c}_in_only_1_seatrade_block_{block_index}",
+                    pulp.LpAffineExpression(
+                        [(assignments[c][f"{block}_{s}"], 1) for s in pref_ranks]
+                    )
+                    == 1,
+                    (
+                        f"{c}_in_only_1_seatrade_block_{block}"
+                        if constraint_names
+                        else None
+                    ),
                 )
         # Constraint 2: Each camper cannot be assigned the same seatrade
         # in both blocks.
-        for s1, s2 in zip(self.seatrades1, self.seatrades2):
-            for c in self.campers:
+        for c, pref_ranks in self.camper_pref_ranks.items():
+            for s in pref_ranks:
                 problem += (
-                    pulp.lpSum([assignments[c][s1], assignments[c][s2]]) <= 1,
-                    f"{c} can't take {s1[2:]} in both blocks",
+                    pulp.LpAffineExpression(
+                        [(assignments[c][f"1_{s}"], 1), (assignments[c][f"2_{s}"], 1)]
+                    )
+                    <= 1,
+                    (
+                        f"{c} can't take {s} in both blocks"
+                        if constraint_names
+                        else None
+                    ),
                 )
         # Constraint 3: Each seatrade is assigned between min and max campers.
-        for s in self.seatrades_full:
-            seatrade = s[2:]  # Remove block index for matching.
+        # Gather each seatrade's terms in one pass over the variables.
+        seatrade_terms = {s: [] for s in self.seatrades_full}
+        for camper_assignments in assignments.values():
+            for s, variable in camper_assignments.items():
+                seatrade_terms[s].append((variable, 1))
+        for s, terms in seatrade_terms.items():
+            seatrade = self.seatrade_of[s]  # Remove block index for matching.
+            campers_min = self.seatrades_prefs[seatrade]["campers_min"]
+            campers_max = self.seatrades_prefs[seatrade]["campers_max"]
+            seatrade_campers = pulp.LpAffineExpression(terms)
             problem += (
-                pulp.lpSum([assignments[c][s] for c in self.campers])
-                >= self.seatrades_prefs[seatrade]["campers_min"],
-                f"More_than_{self.seatrades_prefs[seatrade]['campers_min']}_in_{s}",
+                seatrade_campers >= campers_min,
+                (f"More_than_{campers_min}_in_{s}" if constraint_names else None),
             )
             problem += (
-                pulp.lpSum([assignments[c][s] for c in self.campers])
-                <= self.seatrades_prefs[seatrade]["campers_max"],
-                f"Less_than_{self.seatrades_prefs[seatrade]['campers_max']}_in_{s}",
+                seatrade_campers <= campers_max,
+                (f"Less_than_{campers_max}_in_{s}" if constraint_names else None),
             )
         # Constraint 4: Campers cannot be assigned un-requested seatrades.
-        for c, seatrade_prefs in self.camper_prefs.items():
-            problem += (
-                pulp.lpSum(
-                    [
-                        assignments[c][s]
-                        for s in self.seatrades_full
-                        if s[2:] not in seatrade_prefs
-                    ]
-                )
-                == 0,
-                f"{c}_prefers_not_these_seatrades.",
-            )
+        # Satisfied structurally, un-requested assignments have no variable.
+        # Preference penalty terms per camper: the indicator of each
+        # assignment multiplied by the 0-indexed rank of that seatrade.
+        # Shared by Constraint 5 and the objective.
+        penalty_terms = {
+            c: [
+                (assignments[c][f"{block}_{s}"], rank)
+                for block in [1, 2]
+                for s, rank in pref_ranks.items()
+            ]
+            for c, pref_ranks in self.camper_pref_ranks.items()
+        }
         # Constraint 5: Campers guaranteed one of their top 2 choices.
         # In other words, they cannot be assigned 3rd and 4th choices together.
-        for c, preferences in self.camper_prefs.items():
+        for c, terms in penalty_terms.items():
             problem += (
-                pulp.lpSum(
-                        # Use indicator function from assignment
-                        # multiplied by linear preference penalty
-                        # from index.
+                pulp.LpAffineExpression(terms)
+                <= 4,  # indexing of 0 means 3rd + 4th index is 5.
+                (
+                    f"{c} guaranteed one of the first two seatrades."
+                    if constraint_names
+                    else None
+                ),
+            )
+
+        # Symmetry breaking: blocks 1 and 2 are interchangeable, so pick the
+        # orientation where the anchor camper's block 1 rank is the better one.
+        if symmetry_breaking and self.campers:
+            anchor = min(self.campers)
+            problem += (
+                pulp.LpAffineExpression(
                     [
-                        assignments[c][f"1_{s}"] * (preferences.index(s))
-                        for s in preferences
-                    ] + [
-                        assignments[c][f"2_{s}"] * (preferences.index(s))
-                        for s in preferences
+                        (assignments[anchor][f"{block}_{s}"], sign * rank)
+                        for block, sign in [(1, 1), (2, -1)]
+                        for s, rank in self.camper_pref_ranks[anchor].items()
                     ]
-                ) <= 4,  # indexing of 0 means 3rd + 4th index is 5.
-            f"{c} guaranteed one of the first two seatrades."
+                )
+                <= 0,
+                (
+                    f"{anchor}_block_1_no_worse_than_block_2"
+                    if constraint_names
+                    else None
+                ),
             )
 
         # OBJECTIVE:
-        obj = 0
         # Penalize giving lower-preference seatrades.
-        for c, preferences in self.camper_prefs.items():
-            for block in [1, 2]:
-                obj += pulp.lpSum(
-                    [
-                        # Use indicator function from assignment
-                        # multiplied by linear preference penalty
-                        # from index.
-                        assignments[c][f"{block}_{s}"] * (preferences.index(s))
-                        for s in preferences
-                    ]
-                )
-        problem += obj
+        problem += pulp.LpAffineExpression(
+            [term for terms in penalty_terms.values() for term in terms]
+        )
 
         # Solve and save assignments:
-        status = problem.solve()
-        self.assignments = pd.DataFrame(assignments).applymap(pulp.value).transpose()
+        if warm_start and self._last_solution:
+            for v in problem.variables():
+                v.setInitialValue(self._last_solution.get(v.name, 0))
+        elif warm_start:
+            start = self._greedy_assignment()
+            for i, c in enumerate(self.campers):
+                for s, variable in assignments[c].items():
+                    variable.setInitialValue(start[i, self.seatrade_index[s]])
+        if solver is None:
+            solver = _default_solver(warm_start=warm_start)
+        status = problem.solve(solver)
+        if status == pulp.LpStatusOptimal:
+            self._last_solution = {v.name: v.varValue for v in problem.variables()}
+        # Read values straight into a dense camper x seatrade array, rounded
+        # to exact 0/1 as in _assign_scipy. Pairs without a variable
+        # (un-requested seatrades) stay 0.
+        values = np.zeros((len(self.campers), len(self.seatrades_full)), np.float32)
+        for i, c in enumerate(self.campers):
+            for s, variable in assignments[c].items():
+                values[i, self.seatrade_index[s]] = variable.varValue or 0
+        np.rint(values, out=values)
+        self.assignments = pd.DataFrame(
+            values, index=self.campers, columns=self.seatrades_full
+        )
         self.status = status
         return self.status
 
+    def _greedy_assignment(self) -> np.ndarray:
+        """
+        Builds a quick starting assignment for warm-starting the solver.
+
+        Campers are placed in order, each into their best-ranked seatrade
+        with space left in block 1, then into their best remaining choice
+        in block 2 that keeps them within their top two choices. Minimum
+        sizes are ignored, so the result may not be fully feasible; solvers
+        repair or discard such starts.
+
+        Returns
+        -------
+        np.ndarray
+            A 0/1 camper x seatrades_full matrix.
+        """
+        capacity = np.array(
+            [
+                self.seatrades_prefs[self.seatrade_of[s]]["campers_max"]
+                for s in self.seatrades_full
+            ]
+        )
+        start = np.zeros((len(self.campers), len(self.seatrades_full)))
+        for i, c in enumerate(self.campers):
+            block_1_rank = None
+            for s, rank in self.camper_pref_ranks[c].items():
+                j = self.seatrade_index[f"1_{s}"]
+                if capacity[j] > 0:
+                    start[i, j], block_1_rank = 1, rank
+                    capacity[j] -= 1
+                    break
+            for s, rank in self.camper_pref_ranks[c].items():
+                j = self.seatrade_index[f"2_{s}"]
+                if rank == block_1_rank:
+                    continue
+                if block_1_rank is not None and block_1_rank + rank > 4:
+                    break
+                if capacity[j] > 0:
+                    start[i, j] = 1
+                    capacity[j] -= 1
+                    break
+        return start
+
+    def _assign_scipy(self, symmetry_breaking: bool = True) -> int:
+        """
+        Solves the same problem as `assign` with scipy.optimize.milp (HiGHS).
+
+        Parameters
+        ----------
+        symmetry_breaking : bool
+            Whether to rule out mirrored block 1 / block 2 solutions,
+            see `assign`.
+
+        Returns
+        -------
+        int
+            The PuLP status code equivalent to the solver outcome.
+        """
+        # Everything but the seatrade size limits comes from the campers'
+        # preferences given at construction, so it is built once per
+        # instance. The size limits are read from seatrades_prefs on every
+        # solve, as the PuLP model does.
+        if symmetry_breaking not in self._scipy_models:
+            self._scipy_models[symmetry_breaking] = self._build_scipy_model(
+                symmetry_breaking
+            )
+        cost, matrix, lower, upper, size_rows, bounds = self._scipy_models[
+            symmetry_breaking
+        ]
+        lower, upper = lower.copy(), upper.copy()
+        lower[size_rows], upper[size_rows] = self._seatrade_size_limits()
+        if cost.size == 0:
+            # milp rejects an empty problem. With nothing to assign every
+            # row sums to 0, so the empty assignment is optimal unless a
+            # seatrade needs campers, as PuLP reports.
+            self.assignments = pd.DataFrame(
+                np.zeros((len(self.campers), len(self.seatrades_full)), np.float32),
+                index=self.campers,
+                columns=self.seatrades_full,
+            )
+            if (lower <= 0).all() and (upper >= 0).all():
+                return pulp.LpStatusOptimal
+            return pulp.LpStatusInfeasible
+        constraints = optimize.LinearConstraint(matrix, lower, upper)
+        result = optimize.milp(
+            cost,
+            constraints=constraints,
+            integrality=np.ones(cost.size),
+            bounds=bounds,
+        )
+        values = np.zeros(cost.size) if result.x is None else np.round(result.x)
+        self.assignments = pd.DataFrame(
+            values.reshape(len(self.campers), -1).astype(np.float32),
+            index=self.campers,
+            columns=self.seatrades_full,
+        )
+        return _MILP_STATUS.get(result.status, pulp.LpStatusNotSolved)
+
+    def _seatrade_size_limits(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the campers_min and campers_max of every seatrade in
+        seatrades_full order, read from the current seatrades_prefs.
+        """
+        campers_min, campers_max = (
+            np.tile([self.seatrades_prefs[s][size] for s in self.seatrades], 2)
+            for size in ("campers_min", "campers_max")
+        )
+        return campers_min, campers_max
+
+    def _build_scipy_model(self, symmetry_breaking: bool = True) -> tuple:
+        """
+        Builds the cost vector, constraint rows and variable bounds solved by
+        `_assign_scipy`.
+
+        Variables form a dense camper x seatrades_full grid, variable
+        ``i * len(seatrades_full) + j`` being camper i in seatrade j.
+        Constraint rows are emitted as COO triples and handed to HiGHS as
+        one sparse matrix.
+
+        Parameters
+        ----------
+        symmetry_breaking : bool
+            Whether to include the symmetry breaking row, see `assign`.
+
+        Returns
+        -------
+        Tuple[np.ndarray, sparse.csr_matrix, np.ndarray, np.ndarray, slice,
+        optimize.Bounds]
+            The objective coefficients, the constraint matrix with its lower
+            and upper row limits, the rows holding the seatrade size limits
+            (left unbounded here, see `_seatrade_size_limits`) and the
+            variable bounds.
+        """
+        n_campers, n_seatrades = len(self.campers), len(self.seatrades_full)
+        n_vars = n_campers * n_seatrades
+        n_blocks = len(self.seatrades)  # Seatrades in each block.
+        # 0-indexed preference ranks, -1 where un-requested.
+        ranks = self.camper_pref_matrix.astype(np.int64) - 1
+
+        rows, cols, data = [], [], []
+        lower, upper = [], []
+
+        def add_rows(
+            row_of: np.ndarray,
+            variables: np.ndarray,
+            coefs: np.ndarray,
+            lb: np.ndarray,
+            ub: np.ndarray,
+        ):
+            """
+            Appends constraint rows lb <= coefs @ x[variables] <= ub, where
+            row_of numbers each entry's row from 0 within this batch.
+            """
+            rows.append(np.asarray(row_of) + len(lower))
+            cols.append(np.asarray(variables))
+            data.append(np.asarray(coefs))
+            lower.extend(lb)
+            upper.extend(ub)
+
+        # Constraint 1: Each camper is assigned 1 seatrade in each of 2 blocks.
+        # Each camper's row of the grid is their block 1 then block 2
+        # seatrades, so the rows are consecutive runs of n_blocks variables:
+        # an identity per (camper, block) expanded by a row of ones.
+        camper_blocks = sparse.kron(
+            sparse.eye(2 * n_campers), np.ones((1, n_blocks)), format="coo"
+        )
+        add_rows(
+            camper_blocks.row,
+            camper_blocks.col,
+            camper_blocks.data,
+            np.ones(2 * n_campers),
+            np.ones(2 * n_campers),
+        )
+        # Constraint 2: Each camper cannot be assigned the same seatrade
+        # in both blocks. One row per (camper, seatrade) pairing the block 1
+        # and block 2 variables.
+        pairs = np.arange(n_campers * n_blocks)
+        block_1 = pairs // n_blocks * n_seatrades + pairs % n_blocks
+        add_rows(
+            np.concatenate([pairs, pairs]),
+            np.concatenate([block_1, block_1 + n_blocks]),
+            np.ones(2 * pairs.size),
+            np.zeros(pairs.size),
+            np.ones(pairs.size),
+        )
+        # Constraint 3: Each seatrade is assigned between min and max campers.
+        # One row per block seatrade over its column of the grid. The limits
+        # are filled in by each solve.
+        size_rows = slice(len(lower), len(lower) + n_seatrades)
+        variables = np.arange(n_vars)
+        add_rows(
+            variables % n_seatrades,
+            variables,
+            np.ones(n_vars),
+            np.full(n_seatrades, -np.inf),
+            np.full(n_seatrades, np.inf),
+        )
+        # Constraint 4: Campers cannot be assigned un-requested seatrades.
+        # Expressed as an upper bound of 0 on those variables.
+        var_upper = (ranks >= 0).ravel().astype(float)
+        # Constraint 5: Campers guaranteed one of their top 2 choices.
+        # One row per camper over all of their requested seatrades.
+        camper_idx, seatrade_idx = np.nonzero(ranks >= 0)
+        add_rows(
+            camper_idx,
+            camper_idx * n_seatrades + seatrade_idx,
+            ranks[camper_idx, seatrade_idx],
+            np.full(n_campers, -np.inf),
+            np.full(n_campers, 4),  # indexing of 0 means 3rd + 4th index is 5.
+        )
+
+        # Symmetry breaking: anchor camper's block 1 rank <= block 2 rank.
+        if symmetry_breaking and self.campers:
+            i = self.campers.index(min(self.campers))
+            requested = np.flatnonzero(ranks[i] >= 0)
+            signs = np.where(requested < n_blocks, 1, -1)
+            add_rows(
+                np.zeros(requested.size, dtype=int),
+                i * n_seatrades + requested,
+                signs * ranks[i, requested],
+                [-np.inf],
+                [0],
+            )
+
+        # OBJECTIVE: Penalize giving lower-preference seatrades.
+        cost = np.clip(ranks, 0, None).ravel().astype(float)
+
+        matrix = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(lower), n_vars),
+        )
+        return (
+            cost,
+            matrix,
+            np.array(lower, dtype=float),
+            np.array(upper, dtype=float),
+            size_rows,
+            optimize.Bounds(np.zeros(n_vars), var_upper),
+        )
+
     def get_assignments_by_cabin(self, assignments: pd.DataFrame) -> dict:
         """Get the assignments organized by Cabin -> Camper -> Seatrade."""
         ...
@@ -185,37 +607,47 @@ class Seatrades:
             .reset_index()
             .rename(columns={"index": "camper"})
         )
-        
-        def lookup_preference(row) -> int:
-            """
-            Returns the preference number of the
-            seatrade for a given camper.
-            If not selected due to infeasibility,
-            returns 999.
-            """
-            if row.assignment:
-                row_camper_prefs = self.camper_prefs[row.camper]
-                if row.seatrade[2:] in row_camper_prefs:
-                    pref_rank = row_camper_prefs.index(row.seatrade[2:]) + 1
-                else:
-                    pref_rank = 999
-            else:
-                pref_rank = 0
-            return pref_rank
-
-        df["preference"] = df.apply(lookup_preference, axis=1)
+        # Look up 1-indexed preference ranks with one fancy-index into the
+        # dense preference matrix instead of a Python call per row.
+        camper_rows = pd.Index(self.campers).get_indexer(df["camper"])
+        seatrade_cols = pd.Index(self.seatrades_full).get_indexer(df["seatrade"])
+        # get_indexer marks unknown labels with -1, which would silently
+        # index the last row/column.
+        if (camper_rows < 0).any() or (seatrade_cols < 0).any():
+            unknown = sorted(
+                set(df.loc[camper_rows < 0, "camper"])
+                | set(df.loc[seatrade_cols < 0, "seatrade"]),
+                key=str,
+            )
+            raise ValueError(
+                f"Assignments contain unknown campers/seatrades: {unknown}"
+            )
+        ranks = self.camper_pref_matrix[camper_rows, seatrade_cols]
+        # Unassigned seatrades score 0. Assignments outside a camper's
+        # preferences (only possible if infeasible) score 999.
+        df["preference"] = np.where(
+            df["assignment"] != 0, np.where(ranks == 0, 999, ranks), 0
+        ).astype(int)
         return df
 
     def display_assignments(self) -> alt.Chart:
         """
         Displays the assignments of the seatrades visually for inference.
+
+        The chart is built once per call to `assign` and copies of it are
+        returned afterwards. Edits made in place to `self.assignments` are
+        not detected, run `assign` again to redraw.
         """
         if not self.status:
             raise ValueError(
                 "Seatrades.assignments (and status code) not found."
                 "Did you remember to run Seatrades.assign() first?"
             )
+        if self._chart_cache is not None and self._chart_cache[0] == self._solve_count:
+            return self._chart_cache[1].copy()
         df = self.wrangle_assignments_to_longform(self.assignments)
+        # Only ship the encoded columns, the chart data is inlined in the spec.
+        df = df[["camper", "seatrade", "preference"]]
 
         # Matrix Assignment chart.
         assignment_base = (
@@ -251,7 +683,8 @@ class Seatrades:
             .transform_filter(alt.datum.preference > 0)
         )
         assignment_chart = assignment_rectangles + assignment_text
-        return assignment_chart
+        self._chart_cache = (self._solve_count, assignment_chart)
+        return assignment_chart.copy()
 
     def export_assignments_to_csv(self, filepath: str = "assignments.csv"):
         """
@@ -263,9 +696,17 @@ class Seatrades:
         filepath : str
            The str to the filepath to export the assignments to.
         """
-        if not self.assigments:
+        if not hasattr(self, "assignments"):
             raise ValueError(
                 "Seatrades.assignments not found."
                 "Did you remember to run Seatrades.assign() first?"
             )
-        raise NotImplementedError
+        # Rows are written straight from the solution array, one camper
+        # per line, without building an intermediate DataFrame.
+        # Round before the cast, which would truncate 0.99999 to 0.
+        values = np.rint(self.assignments.to_numpy(dtype=float)).astype(np.int8)
+        with open(filepath, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["camper", *self.assignments.columns])
+            for camper, row in zip(self.assignments.index, values):
+                writer.writerow([camper, *row.tolist()])
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# src/ is not an installed package, import seatrades from it directly.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pulp
+import pytest
+
+from seatrades import Seatrades
+
+
+def make_prefs(campers_max: int, seed: int = 0):
+    """Builds a small random roster: 4 cabins of 6 campers, 8 seatrades."""
+    rng = random.Random(seed)
+    seatrades = [f"S{i}" for i in range(8)]
+    cabin_camper_prefs = {
+        f"Cabin{cabin}": {
+            f"Camper{cabin * 6 + camper:03}": rng.sample(seatrades, 4)
+            for camper in range(6)
+        }
+        for cabin in range(4)
+    }
+    seatrades_prefs = {
+        s: {"campers_min": 1, "campers_max": campers_max} for s in seatrades
+    }
+    return cabin_camper_prefs, seatrades_prefs
+
+
+def solve(campers_max: int, method: str):
+    """Returns the status and objective (sum of 0-indexed ranks) of a solve."""
+    seatrades = Seatrades(*make_prefs(campers_max))
+    status = seatrades.assign(method=method, solver=pulp.PULP_CBC_CMD(msg=False))
+    ranks = np.clip(seatrades.camper_pref_matrix - 1, 0, None)
+    return status, int((seatrades.assignments.to_numpy() * ranks).sum())
+
+
+@pytest.mark.parametrize("campers_max", [8, 4, 3])
+def test_backends_agree_on_feasible_roster(campers_max):
+    pulp_status, pulp_objective = solve(campers_max, "pulp")
+    scipy_status, scipy_objective = solve(campers_max, "scipy")
+    assert pulp_status == scipy_status == pulp.LpStatusOptimal
+    assert pulp_objective == scipy_objective
+
+
+def test_backends_agree_on_infeasible_roster():
+    # 24 campers cannot fit into 8 seatrades of at most 1 camper per block.
+    assert solve(1, "pulp")[0] == pulp.LpStatusInfeasible
+    assert solve(1, "scipy")[0] == pulp.LpStatusInfeasible
+
+
+@pytest.mark.parametrize("method", ["pulp", "scipy"])
+@pytest.mark.parametrize(
+    "campers_min, expected",
+    [(0, pulp.LpStatusOptimal), (1, pulp.LpStatusInfeasible)],
+)
+def test_empty_roster(method, campers_min, expected):
+    seatrades_prefs = {"S0": {"campers_min": campers_min, "campers_max": 2}}
+    seatrades = Seatrades({}, seatrades_prefs)
+    status = seatrades.assign(method=method, solver=pulp.PULP_CBC_CMD(msg=False))
+    assert status == expected
+    assert seatrades.assignments.shape == (0, 2)